@@ -1,24 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, List
 import firebase_admin
-from firebase_admin import credentials, auth, firestore, storage
+from firebase_admin import credentials, auth, firestore, firestore_async, storage
 from pydantic import BaseModel
-import json
+import orjson
 import datetime
 import logging
+import logging.handlers
+import queue
+import atexit
 import tempfile
 import requests
 from urllib.parse import urlparse
 import time
 from functools import wraps
+from contextlib import asynccontextmanager
 import os
+import asyncio
+import hashlib
+import itertools
+from cachetools import TTLCache
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.cloud.firestore_v1.field_path import FieldPath
+import httpx
+from firebase_tokens import verify_firebase_token
 
 # Set up logging with more detail
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+
+# Writing records happens on a listener thread. QueueHandler.prepare() still
+# merges the message arguments and renders any traceback on the calling thread;
+# the listener's handlers apply the full format and do the stream I/O. Skipped
+# if a previous import of this module already installed the queue (e.g.
+# `python app.py`).
+if not any(isinstance(handler, logging.handlers.QueueHandler) for handler in logging.root.handlers):
+    _log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(_log_queue, *logging.root.handlers, respect_handler_level=True)
+    logging.root.handlers = [logging.handlers.QueueHandler(_log_queue)]
+    _log_listener.start()
+    # Flushes whatever is still queued on interpreter exit
+    atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 # Decorator for timing and logging operations
@@ -48,6 +79,21 @@ def log_operation(operation_name: str):
         return wrapper
     return decorator
 
+# New writes are truncated to whole seconds (rows written before this keep
+# their microseconds), so the formatted string is cached and only rebuilt when
+# the second changes
+_now_iso_cache = (0, "")
+
+def now_iso() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    global _now_iso_cache
+    now = int(time.time())
+    if now != _now_iso_cache[0]:
+        # Naive UTC, matching the format of timestamps already stored
+        utc_now = datetime.datetime.fromtimestamp(now, datetime.timezone.utc).replace(tzinfo=None)
+        _now_iso_cache = (now, utc_now.isoformat())
+    return _now_iso_cache[1]
+
 # Custom exceptions
 class VideoNotFoundException(HTTPException):
     def __init__(self, video_id: str):
@@ -71,59 +117,253 @@ class ValidationException(HTTPException):
         )
 
 # Enhanced helper functions
-async def get_video_or_none(video_id: str, request_id: str = None) -> Optional[dict]:
-    """Get video document or return None if not found"""
+def video_snapshot_to_dict(video) -> dict:
+    """Convert a video snapshot to response data with its ID and ISO timestamps"""
+    video_data = video.to_dict()
+    video_data['videoId'] = video.id  # Include the ID in the data
+    
+    # Convert Firestore timestamps to ISO format strings
+    uploaded_at = video_data.get('uploadedAt')
+    if uploaded_at is not None:
+        video_data['uploadedAt'] = uploaded_at.isoformat()
+    return video_data
+
+# Documents per db.get_all() call when batch-reading videos
+GET_ALL_CHUNK_SIZE = 100
+
+async def get_videos_by_ids(video_ids: List[str], request_id: Optional[str] = None) -> dict:
+    """Fetch many videos with one batched read, returning videoId -> video data for those that exist"""
     start_time = time.time()
-    logger.info(f"[{request_id}] Fetching video: {video_id}")
+    unique_ids = list(dict.fromkeys(video_ids))
+    if not unique_ids:
+        return {}
     
+    videos = {}
+    missing_ids = []
+    for video_id in unique_ids:
+        cached = _video_data_cache.get(video_id)
+        if cached is not None:
+            videos[video_id] = cached
+        else:
+            missing_ids.append(video_id)
+    
+    if missing_ids:
+        async def fetch_chunk(chunk: List[str]) -> list:
+            return [video async for video in db.get_all([VIDEOS.document(video_id) for video_id in chunk])]
+        
+        # Large lookups are split into concurrent BatchGetDocuments calls so
+        # latency stays near one round trip instead of growing with the count
+        chunks = [missing_ids[i:i + GET_ALL_CHUNK_SIZE] for i in range(0, len(missing_ids), GET_ALL_CHUNK_SIZE)]
+        for snapshots in await asyncio.gather(*[fetch_chunk(chunk) for chunk in chunks]):
+            for video in snapshots:
+                if video.exists:
+                    video_data = video_snapshot_to_dict(video)
+                    _video_data_cache[video.id] = video_data
+                    videos[video.id] = video_data
+    
+    execution_time = (time.time() - start_time) * 1000
+    logger.info(f"[{request_id}] Retrieved {len(videos)} of {len(unique_ids)} videos "
+                f"({len(unique_ids) - len(missing_ids)} cache hits, {len(missing_ids)} misses) in {execution_time:.2f}ms")
+    return videos
+
+async def cleanup_orphaned_references(user_id: str, missing_video_ids: List[str], request_id: Optional[str] = None) -> None:
+    """Delete the user's reactions and try-list items for videos that no longer exist"""
     try:
-        video_ref = db.collection('videos').document(video_id)
-        video = video_ref.get()
-        if not video.exists:
-            logger.warning(f"[{request_id}] Video not found: {video_id} - This may indicate an orphaned reference")
-            return None
-        
-        video_data = video.to_dict()
-        video_data['videoId'] = video.id  # Include the ID in the data
-        
-        # Convert Firestore timestamps to ISO format strings
-        if 'uploadedAt' in video_data:
-            video_data['uploadedAt'] = video_data['uploadedAt'].isoformat()
-        
-        execution_time = (time.time() - start_time) * 1000
-        logger.info(f"[{request_id}] Retrieved video {video_id} in {execution_time:.2f}ms")
-        logger.debug(f"[{request_id}] Video data: {json.dumps(video_data, indent=2)}")
-        
-        return video_data
-    except Exception as e:
-        execution_time = (time.time() - start_time) * 1000
-        logger.error(f"[{request_id}] Error fetching video {video_id} in {execution_time:.2f}ms: {str(e)}")
-        return None
+        missing_video_ids = list(dict.fromkeys(missing_video_ids))
+        # Served by the (userId, videoId) composite indexes
+        chunks = [missing_video_ids[i:i + FIRESTORE_IN_LIMIT] for i in range(0, len(missing_video_ids), FIRESTORE_IN_LIMIT)]
+        results = await asyncio.gather(*[
+            collection_ref
+                .where(filter=FieldFilter('userId', '==', user_id))
+                .where(filter=FieldFilter('videoId', 'in', chunk))
+                .select(['videoId'])
+                .get()
+            for collection_ref in (REACTIONS, TRY_LIST)
+            for chunk in chunks
+        ])
+        orphans = [row for rows in results for row in rows]
+        if not orphans:
+            return
+        
+        # The video is gone, so its user_video_state document goes too
+        refs = [row.reference for row in orphans]
+        for video_id in dict.fromkeys(row.get('videoId') for row in orphans):
+            refs.append(user_video_state_ref(user_id, video_id))
+        await commit_batched_deletes(refs)
+        logger.info(f"[{request_id}] Removed {len(orphans)} orphaned references for user {user_id}")
+    except Exception:
+        logger.exception("[%s] Error during cleanup", request_id)
+
+def dumps_json(content) -> bytes:
+    """Encode with orjson; Firestore timestamps are datetime subclasses, which orjson hands to default"""
+    return orjson.dumps(content, default=jsonable_encoder)
+
+class FirestoreJSONResponse(ORJSONResponse):
+    """orjson response that also encodes Firestore values.
+
+    Returning this directly from a handler skips FastAPI's jsonable_encoder pass
+    over the whole payload, which matters for list endpoints.
+    """
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+def weak_etag(body: bytes) -> str:
+    """Weak ETag for an encoded body; weak because GZipMiddleware may send it compressed under the same tag"""
+    return f'W/"{hashlib.sha1(body).hexdigest()}"'
 
-async def cleanup_orphaned_references(user_id: str, request_id: str = None):
-    """Clean up reactions and try-list items that reference non-existent videos"""
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers the given ETag"""
+    if not if_none_match:
+        return False
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    def opaque(tag: str) -> str:
+        return tag[2:] if tag.startswith('W/') else tag
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or opaque(etag) in [opaque(tag) for tag in candidates]
+
+def user_video_doc_id(user_id: str, video_id: str) -> str:
+    """Deterministic document ID for per-user, per-video rows (reactions, try list)"""
+    return f"{user_id}_{video_id}"
+
+# A user's reaction and try list entry for a video are denormalized into
+# user_video_state/{userId}/videos/{videoId}, holding exactly the feed's
+# `userReaction` / `tryListItem` overlays. Every write to the source rows
+# updates this document in the same batch.
+def user_video_state_ref(user_id: str, video_id: str):
+    """Reference to the user's denormalized state document for a video"""
+    return USER_VIDEO_STATE.document(user_id).collection('videos').document(video_id)
+
+def reaction_state(reaction_id: str, reaction_data: dict) -> dict:
+    """State document fields for a reaction"""
+    return {
+        'videoId': reaction_data['videoId'],
+        'userReaction': {
+            'reactionId': reaction_id,
+            'reactionType': reaction_data['reactionType'],
+            'reactionDate': reaction_data['reactionDate']
+        }
+    }
+
+def try_list_state(try_list_id: str, try_list_data: dict) -> dict:
+    """State document fields for a try list entry"""
+    return {
+        'videoId': try_list_data['videoId'],
+        'tryListItem': {
+            'tryListId': try_list_id,
+            'addedDate': try_list_data['addedDate'],
+            'notes': try_list_data.get('notes')
+        }
+    }
+
+async def delete_user_video_doc(collection_ref, state_field: str, user_id: str, video_id: str) -> int:
+    """Delete a user's row for a video, clear it from the video state, and return how many documents were removed"""
+    state_ref = user_video_state_ref(user_id, video_id)
+    clear_state = {state_field: firestore.DELETE_FIELD}
+    
+    batch = db.batch()
+    batch.delete(collection_ref.document(user_video_doc_id(user_id, video_id)), option=db.write_option(exists=True))
+    batch.set(state_ref, clear_state, merge=True)
     try:
-        # Get all user's reactions
-        reactions_ref = db.collection('user_video_reactions').where('userId', '==', user_id)
-        try_list_ref = db.collection('user_try_list').where('userId', '==', user_id)
-        
-        # Check and clean reactions
-        for reaction in reactions_ref.stream():
-            video_id = reaction.get('videoId')
-            if video_id:
-                video = await get_video_or_none(video_id, request_id)
-        
-        # Check and clean try-list
-        for item in try_list_ref.stream():
-            video_id = item.get('videoId')
-            if video_id:
-                video = await get_video_or_none(video_id, request_id)
-                    
-    except Exception as e:
-        logger.error(f"[{request_id}] Error during cleanup: {str(e)}")
+        await batch.commit()
+        return 1
+    except NotFound:
+        # Rows written before deterministic IDs were introduced have random IDs
+        legacy_docs = await collection_ref.where(filter=FieldFilter('userId', '==', user_id)).where(filter=FieldFilter('videoId', '==', video_id)).get()
+        if legacy_docs:
+            batch = db.batch()
+            for doc in legacy_docs:
+                batch.delete(doc.reference)
+            batch.set(state_ref, clear_state, merge=True)
+            await batch.commit()
+        return len(legacy_docs)
+
+# Each user's ratings of a video are summarized in
+# video_rating_aggregates/{userId}_{videoId}, kept current by rate_meal, so
+# get_aggregated_ratings reads one document per video instead of every rating.
+# Only the most recent comments are kept on an aggregate, so the document
+# stays small however often a video is rated
+MAX_AGGREGATE_COMMENTS = 10
+
+def add_rating_to_aggregate(aggregate: Optional[dict], rating_data: dict) -> dict:
+    """Fold one rating into a user's aggregate for its video; ratings must be folded oldest first"""
+    if aggregate is None:
+        aggregate = {
+            'userId': rating_data['userId'],
+            'videoId': rating_data['videoId'],
+            'ratingSum': 0,
+            'ratingCount': 0,
+            'comments': [],
+            'lastRated': rating_data['ratedAt']
+        }
+    aggregate['ratingSum'] += rating_data['rating']
+    aggregate['ratingCount'] += 1
+    if rating_data.get('comment'):
+        aggregate['comments'] = (aggregate['comments'] + [rating_data['comment']])[-MAX_AGGREGATE_COMMENTS:]
+    if rating_data['ratedAt'] > aggregate['lastRated']:
+        aggregate['lastRated'] = rating_data['ratedAt']
+    return aggregate
+
+async def build_rating_aggregate(user_id: str, video_id: str, transaction=None) -> Optional[dict]:
+    """Aggregate a user's ratings of a video from its meal_ratings rows, or None if there are none"""
+    ratings = await (MEAL_RATINGS
+        .where(filter=FieldFilter('userId', '==', user_id))
+        .where(filter=FieldFilter('videoId', '==', video_id))
+        .get(transaction=transaction))
+    aggregate = None
+    for rating_data in sorted((rating.to_dict() for rating in ratings), key=lambda rating_data: rating_data['ratedAt']):
+        aggregate = add_rating_to_aggregate(aggregate, rating_data)
+    return aggregate
+
+# Firestore accepts at most 30 values in an 'in' filter
+FIRESTORE_IN_LIMIT = 30
+
+# Firestore caps a single WriteBatch at 500 operations. Callers that pair each
+# row with its state document rely on this being even so pairs never split.
+FIRESTORE_BATCH_LIMIT = 500
+
+async def commit_batched_sets(writes: List[tuple], merge: bool = False) -> None:
+    """Commit (document_ref, data) pairs as set() calls in WriteBatches of at most FIRESTORE_BATCH_LIMIT"""
+    batches = []
+    for start in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for doc_ref, data in writes[start:start + FIRESTORE_BATCH_LIMIT]:
+            batch.set(doc_ref, data, merge=merge)
+        batches.append(batch.commit())
+    await asyncio.gather(*batches)
+
+# Batch endpoints commit each request as one WriteBatch, writing at most two
+# documents per item (the row and its state), so this has to stay within
+# FIRESTORE_BATCH_LIMIT / 2
+MAX_BATCH_ITEMS = 100
+
+async def check_batch_videos(video_ids: List[str]) -> None:
+    """Reject a batch request that is too large or names videos that don't exist"""
+    if len(video_ids) > MAX_BATCH_ITEMS:
+        raise ValidationException(f"At most {MAX_BATCH_ITEMS} items can be sent in one batch")
+    videos = await get_videos_by_ids(video_ids)
+    missing_ids = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in videos]
+    if missing_ids:
+        raise VideoNotFoundException(', '.join(missing_ids))
+
+async def commit_batched_deletes(refs: List) -> None:
+    """Delete documents in WriteBatches of at most FIRESTORE_BATCH_LIMIT"""
+    batches = []
+    for start in range(0, len(refs), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for doc_ref in refs[start:start + FIRESTORE_BATCH_LIMIT]:
+            batch.delete(doc_ref)
+        batches.append(batch.commit())
+    await asyncio.gather(*batches)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the token verifier on startup and close the shared HTTP client on shutdown"""
+    await warm_token_verifier()
+    yield
+    await close_http_client()
 
 # Initialize FastAPI app
-app = FastAPI(title="HomeYum API")
+app = FastAPI(title="HomeYum API", default_response_class=FirestoreJSONResponse, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -134,44 +374,210 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Feed and list payloads are repetitive JSON and compress well; tiny bodies
+# are sent as-is since compressing them costs more than it saves. List
+# responses are buffered rather than streamed: the gzip responder holds a
+# streamed body until it ends, so streaming would gain nothing here.
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Return a JSON 500 for anything a handler didn't turn into an HTTPException"""
+    # ServerErrorMiddleware re-raises after this returns and the server logs
+    # the traceback then, so nothing is logged here. The exception text stays
+    # out of the response.
+    return FirestoreJSONResponse(status_code=500, content={'detail': 'Internal server error'})
+
 # Initialize Firebase Admin SDK
-cred_dict = {
-    "type": "service_account",
-    "project_id": os.environ.get("FIREBASE_PROJECT_ID"),
-    "private_key_id": os.environ.get("FIREBASE_PRIVATE_KEY_ID"),
-    "private_key": os.environ.get("FIREBASE_PRIVATE_KEY", "").replace("\\n", "\n"),
-    "client_email": os.environ.get("FIREBASE_CLIENT_EMAIL"),
-    "client_id": os.environ.get("FIREBASE_CLIENT_ID"),
-    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-    "token_uri": "https://oauth2.googleapis.com/token",
-    "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-    "client_x509_cert_url": os.environ.get("FIREBASE_CLIENT_CERT_URL"),
-    "universe_domain": "googleapis.com"
-}
+def load_firebase_credentials():
+    """Service account credentials from the FIREBASE_* env vars, or Application Default Credentials if they are unset"""
+    private_key = os.environ.get("FIREBASE_PRIVATE_KEY")
+    if not private_key:
+        # GOOGLE_APPLICATION_CREDENTIALS key file, or the metadata server on GCP
+        return credentials.ApplicationDefault()
+    return credentials.Certificate({
+        "type": "service_account",
+        "project_id": os.environ.get("FIREBASE_PROJECT_ID"),
+        "private_key_id": os.environ.get("FIREBASE_PRIVATE_KEY_ID"),
+        "private_key": private_key.replace("\\n", "\n"),
+        "client_email": os.environ.get("FIREBASE_CLIENT_EMAIL"),
+        "client_id": os.environ.get("FIREBASE_CLIENT_ID"),
+        "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+        "token_uri": "https://oauth2.googleapis.com/token",
+        "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+        "client_x509_cert_url": os.environ.get("FIREBASE_CLIENT_CERT_URL"),
+        "universe_domain": "googleapis.com"
+    })
+
+# Initialize the default app only once, even if this module is imported again
+# (e.g. as both `__main__` and `app` under `python app.py`)
+try:
+    firebase_admin.get_app()
+except ValueError:
+    firebase_admin.initialize_app(load_firebase_credentials(), {
+        'storageBucket': os.environ.get("FIREBASE_STORAGE_BUCKET", "home-yum-36d51.firebasestorage.app")
+    })
 
-cred = credentials.Certificate(cred_dict)
-firebase_admin.initialize_app(cred, {
-    'storageBucket': os.environ.get("FIREBASE_STORAGE_BUCKET", "home-yum-36d51.firebasestorage.app")
-})
+# Get Firestore client. The async client shares one gRPC channel across all
+# coroutines, so a single module-level instance serves every request.
+db = firestore_async.client()
 
-# Get Firestore client
-db = firestore.client()
+# Collection references are immutable and safe to share, so build them once
+USERS = db.collection('users')
+VIDEOS = db.collection('videos')
+REACTIONS = db.collection('user_video_reactions')
+TRY_LIST = db.collection('user_try_list')
+MEALS = db.collection('meals')
+MEAL_RATINGS = db.collection('meal_ratings')
+RECIPES = db.collection('recipes')
+RECIPE_ITEMS = db.collection('recipe_items')
+INGREDIENTS = db.collection('ingredients')
+NUTRITION = db.collection('nutrition')
+USER_VIDEO_STATE = db.collection('user_video_state')
+RATING_AGGREGATES = db.collection('video_rating_aggregates')
 
 # Get Storage bucket
 bucket = storage.bucket()
 
+# Short-lived caches for rarely-changing documents served by read endpoints.
+# Entries are dropped on the corresponding writes; the TTL bounds staleness
+# for writes made by other workers.
+DOCUMENT_CACHE_TTL = 60
+_profile_cache = TTLCache(maxsize=10000, ttl=DOCUMENT_CACHE_TTL)
+_video_cache = TTLCache(maxsize=10000, ttl=DOCUMENT_CACHE_TTL)
+
+# Converted video data (see video_snapshot_to_dict) shared by the reactions,
+# try list, meal and cleanup lookups. This API never writes video documents,
+# so entries only expire. Cached dicts are shared; callers must not mutate them.
+# Sized at roughly 2 KB per entry, i.e. ~100 MB when full.
+_video_data_cache = TTLCache(maxsize=50_000, ttl=DOCUMENT_CACHE_TTL)
+
+# Encoded aggregated ratings responses and their ETags per user; dropped when the user rates a meal
+_aggregated_ratings_cache = TTLCache(maxsize=10000, ttl=DOCUMENT_CACHE_TTL)
+
+# Per-user generation, bumped whenever one of the user's cached entries above
+# is dropped. A read notes the generation before it queries Firestore and only
+# caches its result if it is unchanged, so a read that raced a write can't
+# re-cache the value from before the write. Entries outlive any request.
+_user_cache_generations = TTLCache(maxsize=100_000, ttl=3600)
+_generation_counter = itertools.count(1)
+
+def user_cache_generation(user_id: str) -> int:
+    return _user_cache_generations.get(user_id, 0)
+
+def invalidate_user_cache(cache: TTLCache, user_id: str) -> None:
+    """Drop a user's cached entry and bump their generation"""
+    cache.pop(user_id, None)
+    _user_cache_generations[user_id] = next(_generation_counter)
+
+# (user_id, video_id) pairs whose orphan cleanup ran recently on this worker;
+# each is scheduled at most once per CLEANUP_DEBOUNCE_TTL
+CLEANUP_DEBOUNCE_TTL = 3600
+_cleanup_debounce = TTLCache(maxsize=10000, ttl=CLEANUP_DEBOUNCE_TTL)
+
+def schedule_orphan_cleanup(background_tasks: BackgroundTasks, user_id: str, missing_video_ids: List[str],
+                            request_id: Optional[str] = None) -> None:
+    """Queue cleanup_orphaned_references to run after the response, skipping videos it already ran for recently"""
+    # Debounced per video, so a new orphan is not skipped just because a
+    # different one was cleaned up recently
+    missing_video_ids = [video_id for video_id in missing_video_ids
+                         if (user_id, video_id) not in _cleanup_debounce]
+    if not missing_video_ids:
+        logger.info(f"[{request_id}] Skipping cleanup for user {user_id}, already ran within {CLEANUP_DEBOUNCE_TTL}s")
+        return
+    for video_id in missing_video_ids:
+        _cleanup_debounce[(user_id, video_id)] = True
+    background_tasks.add_task(cleanup_orphaned_references, user_id, missing_video_ids, request_id)
+
+# The first feed page is the same for every user, so it is shared briefly
+# across requests; keyed by page size. Deeper pages always hit Firestore.
+FEED_FIRST_PAGE_TTL = 5
+_feed_first_page_cache = TTLCache(maxsize=100, ttl=FEED_FIRST_PAGE_TTL)
+
+# Cache of verified ID tokens keyed by the SHA-256 of the raw token.
+# Firebase ID tokens live for at most an hour, so that bounds the TTL; each
+# entry is additionally checked against the token's own `exp` claim on hit.
+TOKEN_CACHE_TTL = 3600
+TOKEN_EXPIRY_LEEWAY = 30
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL)
+
+def _get_cached_token(key: bytes) -> Optional[dict]:
+    """Return a cached decoded token if it is not about to expire"""
+    decoded_token = _token_cache.get(key)
+    if decoded_token and decoded_token.get('exp', 0) > time.time() + TOKEN_EXPIRY_LEEWAY:
+        return decoded_token
+    return None
+
+# Firebase ID tokens are RS256 JWTs signed by Google's rotating securetoken
+# certs. They are verified locally against a cached copy of those certs, which
+# is refetched once the endpoint's Cache-Control max-age lapses.
+FIREBASE_PROJECT_ID = firebase_admin.get_app().project_id
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+FIREBASE_CERTS_DEFAULT_TTL = 3600
+
+http_client = httpx.AsyncClient(timeout=10.0)
+_firebase_certs = {'certs': {}, 'expires_at': 0.0}
+_firebase_certs_lock = asyncio.Lock()
+
+def _max_age(cache_control: str) -> int:
+    """max-age in seconds from a Cache-Control header, or the default TTL"""
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() == 'max-age' and value.isdigit():
+            return int(value)
+    return FIREBASE_CERTS_DEFAULT_TTL
+
+async def get_firebase_certs() -> dict:
+    """Return the current ID token signing certs as key ID -> PEM certificate"""
+    if time.time() < _firebase_certs['expires_at']:
+        return _firebase_certs['certs']
+    
+    async with _firebase_certs_lock:
+        # Another request may have refreshed them while this one waited
+        if time.time() < _firebase_certs['expires_at']:
+            return _firebase_certs['certs']
+        start_time = time.time()
+        response = await http_client.get(FIREBASE_CERTS_URL)
+        response.raise_for_status()
+        _firebase_certs['certs'] = response.json()
+        _firebase_certs['expires_at'] = time.time() + _max_age(response.headers.get('cache-control', ''))
+        execution_time = (time.time() - start_time) * 1000
+        logger.info(f"Fetched {len(_firebase_certs['certs'])} Firebase signing certs in {execution_time:.2f}ms")
+        return _firebase_certs['certs']
+
+async def decode_firebase_token(token: str) -> dict:
+    """Verify a Firebase ID token and return its claims, with `uid` set as auth.verify_id_token does"""
+    return verify_firebase_token(token, await get_firebase_certs(), FIREBASE_PROJECT_ID)
+
 # Dependency to verify Firebase ID token
-async def verify_token(authorization: Optional[str] = Header(None)):
+async def verify_token(authorization: Optional[str] = Header(None)) -> dict:
     if not authorization or not authorization.startswith('Bearer '):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
     
-    token = authorization.split(' ')[1]
-    try:
-        decoded_token = auth.verify_id_token(token)
+    token = authorization[len('Bearer '):]
+    key = hashlib.sha256(token.encode()).digest()
+    decoded_token = _get_cached_token(key)
+    if decoded_token:
         return decoded_token
+
+    try:
+        decoded_token = await decode_firebase_token(token)
     except Exception as e:
         logger.error(f"Token verification failed: {str(e)}")
         raise HTTPException(status_code=401, detail="Invalid token")
+    _token_cache[key] = decoded_token
+    return decoded_token
+
+async def warm_token_verifier() -> None:
+    """Warm the signing cert cache so the first authenticated request skips the fetch"""
+    try:
+        await get_firebase_certs()
+    except Exception as e:
+        # Verification still fetches the certs lazily, so this is not fatal
+        logger.warning(f"Failed to warm Firebase signing certs: {str(e)}")
+
+async def close_http_client() -> None:
+    await http_client.aclose()
 
 # Models
 class UserProfile(BaseModel):
@@ -202,6 +608,9 @@ class MealScheduleUpdate(BaseModel):
     mealDate: str
     mealTime: str
 
+class MealScheduleBulkCreate(BaseModel):
+    meals: List[MealScheduleCreate]
+
 # Routes
 @app.get("/")
 async def root():
@@ -211,19 +620,27 @@ async def root():
 async def get_user_profile(token_data=Depends(verify_token)):
     """Get user profile data from Firestore"""
     user_id = token_data['uid']
+    cached = _profile_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
     try:
-        doc_ref = db.collection('users').document(user_id)
-        doc = doc_ref.get()
+        generation = user_cache_generation(user_id)
+        doc_ref = USERS.document(user_id)
+        doc = await doc_ref.get()
         if doc.exists:
             user_data = doc.to_dict()
             # Remove sensitive data
-            if 'passwordHash' in user_data:
-                del user_data['passwordHash']
+            user_data.pop('passwordHash', None)
+            if user_cache_generation(user_id) == generation:
+                _profile_cache[user_id] = user_data
             return user_data
         logger.error(f"User profile not found for ID: {user_id}")
         raise HTTPException(status_code=404, detail="User profile not found")
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Error getting user profile: {str(e)}")
+        logger.exception("Error getting user profile")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/user/create")
@@ -231,24 +648,28 @@ async def create_user_profile(token_data=Depends(verify_token)):
     """Create a new user profile in Firestore after signup"""
     user_id = token_data['uid']
     try:
-        # Get user email from Firebase Auth
-        user = auth.get_user(user_id)
+        # The ID token carries the email claim; only ask Firebase Auth when it is absent
+        email = token_data.get('email')
+        if not email:
+            user = await run_in_threadpool(auth.get_user, user_id)
+            email = user.email
         
         # Create user document
-        now = datetime.datetime.utcnow().isoformat()
+        now = now_iso()
         user_data = {
             "userId": user_id,
-            "email": user.email,
-            "username": user.email.split('@')[0],  # Default username from email
+            "email": email,
+            "username": email.split('@')[0],  # Default username from email
             "createdAt": now,
             "updatedAt": now
         }
         
-        doc_ref = db.collection('users').document(user_id)
-        doc_ref.set(user_data)
+        doc_ref = USERS.document(user_id)
+        await doc_ref.set(user_data)
+        invalidate_user_cache(_profile_cache, user_id)
         return user_data
     except Exception as e:
-        logger.error(f"Error creating user profile: {str(e)}")
+        logger.exception("Error creating user profile")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/user/profile")
@@ -259,14 +680,45 @@ async def update_user_profile(profile: UserProfile, token_data=Depends(verify_to
         raise HTTPException(status_code=403, detail="Cannot update other user's profile")
         
     try:
-        profile_dict = profile.dict(exclude={'passwordHash'})  # Never update password hash
-        profile_dict["updatedAt"] = datetime.datetime.utcnow().isoformat()
+        profile_dict = profile.model_dump(exclude={'passwordHash'}, mode='json')  # Never update password hash
+        profile_dict["updatedAt"] = now_iso()
         
-        doc_ref = db.collection('users').document(user_id)
-        doc_ref.update(profile_dict)
+        doc_ref = USERS.document(user_id)
+        await doc_ref.update(profile_dict)
+        invalidate_user_cache(_profile_cache, user_id)
         return {"message": "Profile updated successfully"}
     except Exception as e:
-        logger.error(f"Error updating user profile: {str(e)}")
+        logger.exception("Error updating user profile")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/user/bootstrap")
+@log_operation("get_user_bootstrap")
+async def get_user_bootstrap(token_data=Depends(verify_token)):
+    """Get profile, uploaded videos, reactions and try list in one round trip"""
+    user_id = token_data['uid']
+    try:
+        # The four reads are independent, so issue them concurrently
+        profile_doc, video_docs, reaction_docs, try_list_docs = await asyncio.gather(
+            USERS.document(user_id).get(),
+            # Same field mask as /api/videos/user/{user_id}
+            VIDEOS.where(filter=FieldFilter('userId', '==', user_id)).select(VIDEO_LIST_FIELDS).order_by('uploadedAt', direction=firestore.Query.DESCENDING).get(),
+            REACTIONS.where(filter=FieldFilter('userId', '==', user_id)).get(),
+            TRY_LIST.where(filter=FieldFilter('userId', '==', user_id)).get()
+        )
+        
+        profile = None
+        if profile_doc.exists:
+            profile = profile_doc.to_dict()
+            profile.pop('passwordHash', None)
+        
+        return {
+            "profile": profile,
+            "videos": [{**doc.to_dict(), 'videoId': doc.id} for doc in video_docs],
+            "reactions": [{**doc.to_dict(), 'reactionId': doc.id} for doc in reaction_docs],
+            "tryList": [{**doc.to_dict(), 'tryListId': doc.id} for doc in try_list_docs]
+        }
+    except Exception as e:
+        logger.exception("Error getting user bootstrap data")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Video Feed Endpoints
@@ -282,78 +734,96 @@ class VideoResponse(BaseModel):
     uploadedAt: str
     source: str
 
+# Fields returned by list endpoints; Firestore sends only these via a field mask
+VIDEO_LIST_FIELDS = [field for field in VideoResponse.model_fields if field != 'videoId'] + ['userId']
+
+def video_feed_query(page_size: int, cursor=None):
+    """Feed query, newest first, starting after a cursor (snapshot or field values) when given"""
+    # Ordering explicitly by document ID as a tie-breaker matches Firestore's
+    # implicit ordering, so it needs no extra index
+    query = (VIDEOS
+             .select(VIDEO_LIST_FIELDS)
+             .order_by('uploadedAt', direction=firestore.Query.DESCENDING)
+             .order_by(FieldPath.document_id(), direction=firestore.Query.DESCENDING))
+    if cursor is not None:
+        query = query.start_after(cursor)
+    return query.limit(page_size)
+
 @app.get("/api/videos/feed")
 async def get_video_feed(
     page_size: int = 10,
     last_video_id: Optional[str] = None,
+    last_uploaded_at: Optional[str] = None,
     token_data=Depends(verify_token)
 ):
-    """Get paginated video feed with user reactions and try list status"""
+    """Get paginated video feed with user reactions and try list status.
+    
+    Pass the last video's `videoId` as `last_video_id` for the next page, and
+    its `uploadedAt` as `last_uploaded_at` to skip reading that document. The
+    echoed timestamp must be URL-encoded, since the `+` in its `+00:00` offset
+    otherwise decodes to a space.
+    """
+    cursor_uploaded_at = None
+    if last_uploaded_at and not last_video_id:
+        # uploadedAt alone is not a unique position in the feed
+        raise ValidationException("last_uploaded_at requires last_video_id")
+    if last_uploaded_at:
+        try:
+            cursor_uploaded_at = datetime.datetime.fromisoformat(last_uploaded_at)
+        except ValueError:
+            raise ValidationException(f"Invalid last_uploaded_at: {last_uploaded_at}")
+    
     try:
         user_id = token_data['uid']
-        query = db.collection('videos').order_by('uploadedAt', direction=firestore.Query.DESCENDING)
-        
-        if last_video_id:
-            last_doc = db.collection('videos').document(last_video_id).get()
+        cursor = None
+        if last_video_id and cursor_uploaded_at:
+            # Cursor values echoed back by the client avoid reading the last document
+            cursor = {'uploadedAt': cursor_uploaded_at, '__name__': last_video_id}
+        elif last_video_id:
+            last_doc = await VIDEOS.document(last_video_id).get()
             if last_doc.exists:
-                query = query.start_after(last_doc)
+                cursor = last_doc
         
-        query = query.limit(page_size)
-        docs = query.stream()
-        
-        videos = []
-        for doc in docs:
-            video_data = doc.to_dict()
-            video_data['videoId'] = doc.id
-            
-            # Get user's reaction for this video
-            reactions_ref = db.collection('user_video_reactions')
-            reaction = reactions_ref.where('userId', '==', user_id).where('videoId', '==', doc.id).get()
-            
-            # Add reaction data if exists
-            if reaction:
-                reaction_data = reaction[0].to_dict()
-                video_data['userReaction'] = {
-                    'reactionId': reaction[0].id,
-                    'reactionType': reaction_data['reactionType'],
-                    'reactionDate': reaction_data['reactionDate']
-                }
-            else:
-                video_data['userReaction'] = None
-
-            # Get try list status for this video
-            try_list_ref = db.collection('user_try_list')
-            try_list_item = try_list_ref.where('userId', '==', user_id).where('videoId', '==', doc.id).get()
-            
-            # Add try list data if exists
-            if try_list_item:
-                try_list_data = try_list_item[0].to_dict()
-                video_data['tryListItem'] = {
-                    'tryListId': try_list_item[0].id,
-                    'addedDate': try_list_data['addedDate'],
-                    'notes': try_list_data.get('notes')
-                }
-            else:
-                video_data['tryListItem'] = None
-            
-            videos.append(video_data)
+        query = video_feed_query(page_size, cursor)
         
-        return videos
+        if last_video_id:
+            videos = [{**doc.to_dict(), 'videoId': doc.id} async for doc in query.stream()]
+        else:
+            first_page = _feed_first_page_cache.get(page_size)
+            if first_page is None:
+                first_page = [{**doc.to_dict(), 'videoId': doc.id} async for doc in query.stream()]
+                _feed_first_page_cache[page_size] = first_page
+            # Copy so per-user overlays never leak into the shared cached page
+            videos = [dict(video_data) for video_data in first_page]
+        
+        # The user's reaction and try list overlays for the whole page come from
+        # their denormalized state documents in one batched read
+        states = {}
+        if videos:
+            state_refs = [user_video_state_ref(user_id, video_data['videoId']) for video_data in videos]
+            states = {state.id: state.to_dict() async for state in db.get_all(state_refs) if state.exists}
     except Exception as e:
-        logger.error(f"Error getting video feed: {str(e)}")
+        logger.exception("Error getting video feed")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    for video_data in videos:
+        state = states.get(video_data['videoId'], {})
+        video_data['userReaction'] = state.get('userReaction')
+        video_data['tryListItem'] = state.get('tryListItem')
+    
+    return FirestoreJSONResponse(content=videos)
 
 @app.get("/api/videos/user/{user_id}")
 async def get_user_videos(user_id: str, token_data=Depends(verify_token)):
     """Get videos uploaded by a specific user"""
     try:
-        # Query videos collection with user_id filter
-        videos_ref = db.collection('videos')
-        query = videos_ref.where('userId', '==', user_id).order_by('uploadedAt', direction=firestore.Query.DESCENDING)
-        docs = query.stream()
+        # Query videos collection with user_id filter; needs the (userId, uploadedAt DESC)
+        # composite index in firestore.indexes.json
+        videos_ref = VIDEOS
+        query = videos_ref.where(filter=FieldFilter('userId', '==', user_id)).select(VIDEO_LIST_FIELDS).order_by('uploadedAt', direction=firestore.Query.DESCENDING)
         
         videos = []
-        for doc in docs:
+        async for doc in query.stream():
             video_data = doc.to_dict()
             video_data['videoId'] = doc.id
             videos.append(video_data)
@@ -361,9 +831,9 @@ async def get_user_videos(user_id: str, token_data=Depends(verify_token)):
         logger.info(f"Found {len(videos)} videos for user {user_id}")
         logger.info(f"Sample video data: {videos[0] if videos else 'No videos found'}")
         
-        return videos
+        return FirestoreJSONResponse(videos)
     except Exception as e:
-        logger.error(f"Error getting user videos: {str(e)}")
+        logger.exception("Error getting user videos")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Reaction endpoints
@@ -373,19 +843,13 @@ async def add_reaction(reaction: VideoReactionCreate, token_data=Depends(verify_
     """Add or update a reaction to a video"""
     request_id = f"reaction-{int(time.time())}"
     logger.info(f"[{request_id}] Adding reaction for video {reaction.videoId}")
-    logger.debug(f"[{request_id}] Reaction data: {json.dumps(reaction.dict(), indent=2)}")
+    logger.debug("[%s] Reaction data: %r", request_id, reaction)
     
     try:
         user_id = token_data['uid']
         
-        # Validate video exists first
-        await get_video_or_none(reaction.videoId, request_id)
-        
-        now = datetime.datetime.utcnow().isoformat()
-        reactions_ref = db.collection('user_video_reactions')
-        
-        # Check if reaction already exists
-        existing_reaction = reactions_ref.where('userId', '==', user_id).where('videoId', '==', reaction.videoId).get()
+        now = now_iso()
+        reactions_ref = REACTIONS
         
         reaction_data = {
             "userId": user_id,
@@ -394,69 +858,112 @@ async def add_reaction(reaction: VideoReactionCreate, token_data=Depends(verify_
             "reactionDate": now
         }
         
-        if existing_reaction:
-            # Update existing reaction
-            doc = existing_reaction[0]
-            logger.info(f"[{request_id}] Updating existing reaction {doc.id}")
-            doc.reference.update(reaction_data)
-            reaction_data['reactionId'] = doc.id
-            logger.info(f"[{request_id}] Updated reaction {doc.id} for video {reaction.videoId}")
-        else:
-            # Create new reaction
-            doc_ref = reactions_ref.document()
-            logger.info(f"[{request_id}] Creating new reaction")
-            doc_ref.set(reaction_data)
-            reaction_data['reactionId'] = doc_ref.id
-            logger.info(f"[{request_id}] Created new reaction {doc_ref.id} for video {reaction.videoId}")
-        
-        logger.debug(f"[{request_id}] Final reaction data: {json.dumps(reaction_data, indent=2)}")
+        # The document ID is derived from (userId, videoId), so a single set()
+        # both creates a new reaction and replaces an existing one
+        doc_ref = reactions_ref.document(user_video_doc_id(user_id, reaction.videoId))
+        
+        @firestore.async_transactional
+        async def save_reaction(transaction):
+            # Checking the video inside the transaction means it can't be
+            # deleted between the existence check and the write
+            video = await VIDEOS.document(reaction.videoId).get(transaction=transaction)
+            if not video.exists:
+                raise VideoNotFoundException(reaction.videoId)
+            transaction.set(doc_ref, reaction_data, merge=True)
+            transaction.set(user_video_state_ref(user_id, reaction.videoId), reaction_state(doc_ref.id, reaction_data), merge=True)
+        
+        await save_reaction(db.transaction())
+        reaction_data['reactionId'] = doc_ref.id
+        logger.info(f"[{request_id}] Saved reaction {doc_ref.id} for video {reaction.videoId}")
+        
+        logger.debug("[%s] Final reaction data: %s", request_id, reaction_data)
         return reaction_data
     except VideoNotFoundException as e:
         raise e
     except Exception as e:
-        logger.error(f"[{request_id}] Error adding reaction: {str(e)}")
+        logger.exception("[%s] Error adding reaction", request_id)
         raise HTTPException(status_code=500, detail=f"Failed to add reaction: {str(e)}")
 
+@app.post("/api/videos/reactions/batch")
+@log_operation("add_reactions_batch")
+async def add_reactions_batch(reactions: List[VideoReactionCreate], token_data=Depends(verify_token)):
+    """Add or update several reactions in one batched write"""
+    try:
+        user_id = token_data['uid']
+        # A video listed twice keeps its last reaction
+        reactions = list({reaction.videoId: reaction for reaction in reactions}.values())
+        await check_batch_videos([reaction.videoId for reaction in reactions])
+        
+        now = now_iso()
+        reactions_ref = REACTIONS
+        
+        batch = db.batch()
+        results = []
+        for reaction in reactions:
+            reaction_data = {
+                "userId": user_id,
+                "videoId": reaction.videoId,
+                "reactionType": reaction.reactionType,
+                "reactionDate": now
+            }
+            doc_ref = reactions_ref.document(user_video_doc_id(user_id, reaction.videoId))
+            batch.set(doc_ref, reaction_data, merge=True)
+            batch.set(user_video_state_ref(user_id, reaction.videoId), reaction_state(doc_ref.id, reaction_data), merge=True)
+            results.append({**reaction_data, 'reactionId': doc_ref.id})
+        
+        if results:
+            await batch.commit()
+        logger.info(f"Saved {len(results)} reactions for user {user_id}")
+        return results
+    except (VideoNotFoundException, ValidationException) as e:
+        raise e
+    except Exception as e:
+        logger.exception("Error adding reactions batch")
+        raise HTTPException(status_code=500, detail=f"Failed to add reactions: {str(e)}")
+
 @app.get("/api/videos/reactions")
 @log_operation("get_user_reactions")
-async def get_user_reactions(token_data=Depends(verify_token)):
+async def get_user_reactions(background_tasks: BackgroundTasks, token_data=Depends(verify_token)):
     """Get all reactions for a user with video data"""
     request_id = f"get-reactions-{int(time.time())}"
     logger.info(f"[{request_id}] Getting reactions for user {token_data['uid']}")
     
     try:
         user_id = token_data['uid']
-        reactions_ref = db.collection('user_video_reactions')
-        reactions = reactions_ref.where('userId', '==', user_id).get()
+        reactions_ref = REACTIONS
+        reactions = await reactions_ref.where(filter=FieldFilter('userId', '==', user_id)).get()
+        
+        logger.info(f"[{request_id}] Found {len(reactions)} reactions")
         
-        logger.info(f"[{request_id}] Found {len(list(reactions))} reactions")
+        # Get video data for all reactions in one batched read
+        videos = await get_videos_by_ids([reaction.get('videoId') for reaction in reactions], request_id)
         
-        reaction_list = []
+        valid_reactions = []
         missing_videos = []
         for reaction in reactions:
             reaction_data = reaction.to_dict()
             reaction_data['reactionId'] = reaction.id
-            logger.debug(f"[{request_id}] Processing reaction {reaction.id}")
+            logger.debug("[%s] Processing reaction %s", request_id, reaction.id)
             
-            # Get video data
-            video_data = await get_video_or_none(reaction_data['videoId'], request_id)
+            video_data = videos.get(reaction_data['videoId'])
             if video_data:
                 reaction_data['video'] = video_data
-                reaction_list.append(reaction_data)
-                logger.debug(f"[{request_id}] Added reaction with video data: {json.dumps(reaction_data, indent=2)}")
+                logger.debug("[%s] Added reaction with video data: %s", request_id, reaction_data)
+                valid_reactions.append(reaction_data)
             else:
                 missing_videos.append(reaction_data['videoId'])
                 logger.warning(f"[{request_id}] Missing video {reaction_data['videoId']} for reaction {reaction.id}")
         
         if missing_videos:
             logger.warning(f"[{request_id}] Found {len(missing_videos)} missing videos: {missing_videos}")
-            # Trigger cleanup in background
-            await cleanup_orphaned_references(user_id, request_id)
+            # Clean up after the response has been sent
+            schedule_orphan_cleanup(background_tasks, user_id, missing_videos, request_id)
+        
+        logger.info(f"[{request_id}] Returned {len(valid_reactions)} valid reactions")
         
-        logger.info(f"[{request_id}] Returning {len(reaction_list)} valid reactions")
-        return reaction_list
+        return FirestoreJSONResponse(content=valid_reactions)
     except Exception as e:
-        logger.error(f"[{request_id}] Error getting reactions: {str(e)}")
+        logger.exception("[%s] Error getting reactions", request_id)
         raise HTTPException(status_code=500, detail=f"Failed to get reactions: {str(e)}")
 
 @app.delete("/api/videos/reactions/{video_id}")
@@ -464,19 +971,17 @@ async def remove_reaction(video_id: str, token_data=Depends(verify_token)):
     """Remove a reaction from a video"""
     try:
         user_id = token_data['uid']
-        reactions_ref = db.collection('user_video_reactions')
-        reactions = reactions_ref.where('userId', '==', user_id).where('videoId', '==', video_id).get()
+        deleted = await delete_user_video_doc(REACTIONS, 'userReaction', user_id, video_id)
         
-        if not reactions:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Reaction not found")
         
-        for reaction in reactions:
-            reaction.reference.delete()
-            logger.info(f"Deleted reaction {reaction.id} for video {video_id}")
-            
+        logger.info(f"Deleted reaction for video {video_id}")
         return {"message": "Reaction removed successfully"}
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Error removing reaction: {str(e)}")
+        logger.exception("Error removing reaction")
         raise HTTPException(status_code=500, detail=f"Failed to remove reaction: {str(e)}")
 
 # Try List endpoints
@@ -486,16 +991,8 @@ async def add_to_try_list(try_item: TryListItemCreate, token_data=Depends(verify
     try:
         user_id = token_data['uid']
         
-        # Validate video exists first
-        await get_video_or_none(try_item.videoId)
-        
-        now = datetime.datetime.utcnow().isoformat()
-        try_list_ref = db.collection('user_try_list')
-        
-        # Check for duplicate
-        existing_item = try_list_ref.where('userId', '==', user_id).where('videoId', '==', try_item.videoId).get()
-        if existing_item:
-            raise DuplicateEntryException("Video already in try list")
+        now = now_iso()
+        try_list_ref = TRY_LIST
         
         try_list_data = {
             "userId": user_id,
@@ -504,8 +1001,24 @@ async def add_to_try_list(try_item: TryListItemCreate, token_data=Depends(verify
             "addedDate": now
         }
         
-        doc_ref = try_list_ref.document()
-        doc_ref.set(try_list_data)
+        # create() fails if the deterministic document already exists, which
+        # replaces a separate duplicate-check query
+        doc_ref = try_list_ref.document(user_video_doc_id(user_id, try_item.videoId))
+        
+        @firestore.async_transactional
+        async def save_try_list_item(transaction):
+            # Checking the video inside the transaction means it can't be
+            # deleted between the existence check and the write
+            video = await VIDEOS.document(try_item.videoId).get(transaction=transaction)
+            if not video.exists:
+                raise VideoNotFoundException(try_item.videoId)
+            transaction.create(doc_ref, try_list_data)
+            transaction.set(user_video_state_ref(user_id, try_item.videoId), try_list_state(doc_ref.id, try_list_data), merge=True)
+        
+        try:
+            await save_try_list_item(db.transaction())
+        except AlreadyExists:
+            raise DuplicateEntryException("Video already in try list")
         try_list_data['tryListId'] = doc_ref.id
         logger.info(f"Added video {try_item.videoId} to try list for user {user_id}")
         
@@ -513,49 +1026,102 @@ async def add_to_try_list(try_item: TryListItemCreate, token_data=Depends(verify
     except (VideoNotFoundException, DuplicateEntryException) as e:
         raise e
     except Exception as e:
-        logger.error(f"Error adding to try list: {str(e)}")
+        logger.exception("Error adding to try list")
+        raise HTTPException(status_code=500, detail=f"Failed to add to try list: {str(e)}")
+
+@app.post("/api/videos/try-list/batch")
+@log_operation("add_to_try_list_batch")
+async def add_to_try_list_batch(try_items: List[TryListItemCreate], token_data=Depends(verify_token)):
+    """Add several videos to user's try list in one batched write, skipping videos already in it"""
+    try:
+        user_id = token_data['uid']
+        # A video listed twice keeps its first entry
+        first_items = {}
+        for try_item in try_items:
+            first_items.setdefault(try_item.videoId, try_item)
+        try_items = list(first_items.values())
+        await check_batch_videos([try_item.videoId for try_item in try_items])
+        
+        now = now_iso()
+        try_list_ref = TRY_LIST
+        
+        doc_refs = [try_list_ref.document(user_video_doc_id(user_id, try_item.videoId)) for try_item in try_items]
+        existing_ids = {doc.id async for doc in db.get_all(doc_refs) if doc.exists} if doc_refs else set()
+        
+        batch = db.batch()
+        results = []
+        skipped = []
+        for try_item, doc_ref in zip(try_items, doc_refs):
+            if doc_ref.id in existing_ids:
+                skipped.append(try_item.videoId)
+                continue
+            try_list_data = {
+                "userId": user_id,
+                "videoId": try_item.videoId,
+                "notes": try_item.notes,
+                "addedDate": now
+            }
+            # create() so an entry added since the read above is not overwritten
+            batch.create(doc_ref, try_list_data)
+            batch.set(user_video_state_ref(user_id, try_item.videoId), try_list_state(doc_ref.id, try_list_data), merge=True)
+            results.append({**try_list_data, 'tryListId': doc_ref.id})
+        
+        if results:
+            try:
+                await batch.commit()
+            except AlreadyExists:
+                raise DuplicateEntryException("Video already in try list")
+        logger.info(f"Added {len(results)} videos to try list for user {user_id}, skipped {len(skipped)} already present")
+        return {"added": results, "skipped": skipped}
+    except (VideoNotFoundException, ValidationException, DuplicateEntryException) as e:
+        raise e
+    except Exception as e:
+        logger.exception("Error adding to try list batch")
         raise HTTPException(status_code=500, detail=f"Failed to add to try list: {str(e)}")
 
 @app.get("/api/videos/try-list")
 @log_operation("get_try_list")
-async def get_try_list(token_data=Depends(verify_token)):
+async def get_try_list(background_tasks: BackgroundTasks, token_data=Depends(verify_token)):
     """Get user's try list with video data"""
     request_id = f"get-trylist-{int(time.time())}"
     logger.info(f"[{request_id}] Getting try list for user {token_data['uid']}")
     
     try:
         user_id = token_data['uid']
-        try_list_ref = db.collection('user_try_list')
-        items = try_list_ref.where('userId', '==', user_id).get()
+        try_list_ref = TRY_LIST
+        items = await try_list_ref.where(filter=FieldFilter('userId', '==', user_id)).get()
+        
+        logger.info(f"[{request_id}] Found {len(items)} try list items")
         
-        logger.info(f"[{request_id}] Found {len(list(items))} try list items")
+        # Get video data for all try list items in one batched read
+        videos = await get_videos_by_ids([item.get('videoId') for item in items], request_id)
         
-        try_list = []
+        valid_items = []
         missing_videos = []
         for item in items:
             try_list_data = item.to_dict()
             try_list_data['tryListId'] = item.id
-            logger.debug(f"[{request_id}] Processing try list item {item.id}")
+            logger.debug("[%s] Processing try list item %s", request_id, item.id)
             
-            # Get video data
-            video_data = await get_video_or_none(try_list_data['videoId'], request_id)
+            video_data = videos.get(try_list_data['videoId'])
             if video_data:
                 try_list_data['video'] = video_data
-                try_list.append(try_list_data)
-                logger.debug(f"[{request_id}] Added try list item with video data: {json.dumps(try_list_data, indent=2)}")
+                logger.debug("[%s] Added try list item with video data: %s", request_id, try_list_data)
+                valid_items.append(try_list_data)
             else:
                 missing_videos.append(try_list_data['videoId'])
                 logger.warning(f"[{request_id}] Missing video {try_list_data['videoId']} for try list item {item.id}")
         
         if missing_videos:
             logger.warning(f"[{request_id}] Found {len(missing_videos)} missing videos: {missing_videos}")
-            # Trigger cleanup in background
-            await cleanup_orphaned_references(user_id, request_id)
+            # Clean up after the response has been sent
+            schedule_orphan_cleanup(background_tasks, user_id, missing_videos, request_id)
+        
+        logger.info(f"[{request_id}] Returned {len(valid_items)} valid try list items")
         
-        logger.info(f"[{request_id}] Returning {len(try_list)} valid try list items")
-        return try_list
+        return FirestoreJSONResponse(content=valid_items)
     except Exception as e:
-        logger.error(f"[{request_id}] Error getting try list: {str(e)}")
+        logger.exception("[%s] Error getting try list", request_id)
         raise HTTPException(status_code=500, detail=f"Failed to get try list: {str(e)}")
 
 @app.delete("/api/videos/try-list/{video_id}")
@@ -563,19 +1129,17 @@ async def remove_from_try_list(video_id: str, token_data=Depends(verify_token)):
     """Remove a video from user's try list"""
     try:
         user_id = token_data['uid']
-        try_list_ref = db.collection('user_try_list')
-        items = try_list_ref.where('userId', '==', user_id).where('videoId', '==', video_id).get()
+        deleted = await delete_user_video_doc(TRY_LIST, 'tryListItem', user_id, video_id)
         
-        if not items:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Video not found in try list")
         
-        for item in items:
-            item.reference.delete()
-            logger.info(f"Removed video {video_id} from try list for user {user_id}")
-            
+        logger.info(f"Removed video {video_id} from try list for user {user_id}")
         return {"message": "Removed from try list successfully"}
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Error removing from try list: {str(e)}")
+        logger.exception("Error removing from try list")
         raise HTTPException(status_code=500, detail=f"Failed to remove from try list: {str(e)}")
 
 # Meal Schedule endpoints
@@ -584,7 +1148,7 @@ async def schedule_meal(meal: MealScheduleCreate, token_data=Depends(verify_toke
     """Schedule a meal for a specific date and time"""
     try:
         user_id = token_data['uid']
-        now = datetime.datetime.utcnow().isoformat()
+        now = now_iso()
         
         # Create meal document
         meal_data = {
@@ -597,13 +1161,51 @@ async def schedule_meal(meal: MealScheduleCreate, token_data=Depends(verify_toke
             "updatedAt": now
         }
         
-        doc_ref = db.collection('meals').document()
-        doc_ref.set(meal_data)
+        doc_ref = MEALS.document()
+        await doc_ref.set(meal_data)
         
         meal_data['mealId'] = doc_ref.id
         return meal_data
     except Exception as e:
-        logger.error(f"Error scheduling meal: {str(e)}")
+        logger.exception("Error scheduling meal")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/meals/schedule/bulk")
+@log_operation("schedule_meals_bulk")
+async def schedule_meals_bulk(bulk: MealScheduleBulkCreate, token_data=Depends(verify_token)):
+    """Schedule several meals in one batched write"""
+    if len(bulk.meals) > MAX_BATCH_ITEMS:
+        raise ValidationException(f"At most {MAX_BATCH_ITEMS} items can be sent in one batch")
+    
+    try:
+        user_id = token_data['uid']
+        now = now_iso()
+        
+        batch = db.batch()
+        results = []
+        for meal in bulk.meals:
+            meal_data = {
+                "userId": user_id,
+                "videoId": meal.videoId,
+                "mealDate": meal.mealDate,
+                "mealTime": meal.mealTime,
+                "completed": False,
+                "createdAt": now,
+                "updatedAt": now
+            }
+            # Document IDs are allocated client-side, so they are known before commit
+            doc_ref = MEALS.document()
+            batch.set(doc_ref, meal_data)
+            results.append({**meal_data, 'mealId': doc_ref.id})
+        
+        # A single batch commits all or nothing, so a failed request can be
+        # retried without scheduling some meals twice
+        if results:
+            await batch.commit()
+        logger.info(f"Scheduled {len(results)} meals for user {user_id}")
+        return results
+    except Exception as e:
+        logger.exception("Error scheduling meals")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/meals/schedule")
@@ -611,26 +1213,24 @@ async def get_scheduled_meals(token_data=Depends(verify_token)):
     """Get user's scheduled meals"""
     try:
         user_id = token_data['uid']
-        meals = db.collection('meals').where('userId', '==', user_id).get()
         
-        # Get all meal ratings for this user
-        ratings = {
-            rating.to_dict()['mealId']: rating.to_dict()  # Changed from videoId to mealId
-            for rating in db.collection('meal_ratings')
-                .where('userId', '==', user_id)
-                .get()
-        }
+        async def get_meals_with_videos():
+            meals = await MEALS.where(filter=FieldFilter('userId', '==', user_id)).get()
+            # Fetch videos for all meals in one batched read
+            video_ids = [meal.get('videoId') for meal in meals]
+            return meals, video_ids, await get_videos_by_ids(video_ids)
         
-        # Fetch videos for all meals
-        video_ids = [meal.to_dict()['videoId'] for meal in meals]
+        # Ratings don't depend on the meals, so fetch them alongside the meals -> videos chain
+        (meals, video_ids, videos), rating_docs = await asyncio.gather(
+            get_meals_with_videos(),
+            MEAL_RATINGS.where(filter=FieldFilter('userId', '==', user_id)).get()
+        )
         
-        # Get videos by their document IDs directly
-        videos = {}
-        if video_ids:
-            for video_id in video_ids:
-                video_doc = db.collection('videos').document(video_id).get()
-                if video_doc.exists:
-                    videos[video_id] = video_doc.to_dict()
+        # Get all meal ratings for this user
+        ratings = {}
+        for rating_doc in rating_docs:
+            rating = rating_doc.to_dict()
+            ratings[rating['mealId']] = rating  # Changed from videoId to mealId
 
         logger.info(f"Found {len(videos)} videos for {len(video_ids)} meal(s)")
         
@@ -640,8 +1240,8 @@ async def get_scheduled_meals(token_data=Depends(verify_token)):
             meal_data['mealId'] = meal.id
             
             # Add video data if available
-            if meal_data['videoId'] in videos:
-                video_data = videos[meal_data['videoId']]
+            video_data = videos.get(meal_data['videoId'])
+            if video_data is not None:
                 meal_data['video'] = {
                     'videoId': meal_data['videoId'],
                     'mealName': video_data.get('mealName', ''),
@@ -652,14 +1252,15 @@ async def get_scheduled_meals(token_data=Depends(verify_token)):
                 logger.warning(f"No video found for meal {meal_data['mealId']} with videoId {meal_data['videoId']}")
             
             # Add rating if available for this specific meal
-            if meal_data['mealId'] in ratings:  # Changed from videoId to mealId
-                meal_data['rating'] = ratings[meal_data['mealId']]
+            rating = ratings.get(meal_data['mealId'])  # Changed from videoId to mealId
+            if rating is not None:
+                meal_data['rating'] = rating
             
             result.append(meal_data)
             
         return result
     except Exception as e:
-        logger.error(f"Error getting scheduled meals: {str(e)}")
+        logger.exception("Error getting scheduled meals")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/meals/schedule/{meal_id}")
@@ -667,8 +1268,8 @@ async def update_meal_schedule(meal_id: str, meal: MealScheduleUpdate, token_dat
     """Update a scheduled meal's date and time"""
     try:
         user_id = token_data['uid']
-        meal_ref = db.collection('meals').document(meal_id)
-        meal_doc = meal_ref.get()
+        meal_ref = MEALS.document(meal_id)
+        meal_doc = await meal_ref.get()
         
         if not meal_doc.exists:
             raise HTTPException(status_code=404, detail="Meal schedule not found")
@@ -680,18 +1281,20 @@ async def update_meal_schedule(meal_id: str, meal: MealScheduleUpdate, token_dat
         update_data = {
             "mealDate": meal.mealDate,
             "mealTime": meal.mealTime,
-            "updatedAt": datetime.datetime.utcnow().isoformat()
+            "updatedAt": now_iso()
         }
         
-        meal_ref.update(update_data)
+        await meal_ref.update(update_data)
         
         return {
             "mealId": meal_id,
             **meal_data,
             **update_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error updating meal schedule: {str(e)}")
+        logger.exception("Error updating meal schedule")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/meals/schedule/{meal_id}")
@@ -699,8 +1302,8 @@ async def delete_meal_schedule(meal_id: str, token_data=Depends(verify_token)):
     """Delete a scheduled meal"""
     try:
         user_id = token_data['uid']
-        meal_ref = db.collection('meals').document(meal_id)
-        meal_doc = meal_ref.get()
+        meal_ref = MEALS.document(meal_id)
+        meal_doc = await meal_ref.get()
         
         if not meal_doc.exists:
             raise HTTPException(status_code=404, detail="Meal schedule not found")
@@ -709,81 +1312,148 @@ async def delete_meal_schedule(meal_id: str, token_data=Depends(verify_token)):
         if meal_data['userId'] != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this meal schedule")
         
-        meal_ref.delete()
+        await meal_ref.delete()
         return {"message": "Meal schedule deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error deleting meal schedule: {str(e)}")
+        logger.exception("Error deleting meal schedule")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Recipe documents carry a copy of their items, ingredients and nutrition under
+# these fields. The child collections are still written for older readers.
+EMBEDDED_RECIPE_FIELDS = ('recipeItems', 'ingredients', 'nutrition')
+
+def embedded_recipe_data(recipe_items: List[dict], ingredients: List[dict], nutrition: Optional[dict]) -> dict:
+    """Fields embedding a recipe's child data in the recipe document"""
+    return {'recipeItems': recipe_items, 'ingredients': ingredients, 'nutrition': nutrition}
+
+def split_embedded_recipe_data(recipe: dict) -> Optional[dict]:
+    """Pop the embedded child data off a recipe dict, or return None if the recipe predates embedding"""
+    if 'recipeItems' not in recipe:
+        return None
+    return {field: recipe.pop(field, None) for field in EMBEDDED_RECIPE_FIELDS}
+
 @app.get("/api/videos/{video_id}/recipe")
 async def get_recipe_data(video_id: str, token_data=Depends(verify_token)):
     """Get recipe data for a video including ingredients, instructions, and nutrition info"""
     try:
         # Get recipe data
-        recipe_ref = db.collection('recipes').where('videoId', '==', video_id).limit(1).get()
+        recipe_ref = await RECIPES.where(filter=FieldFilter('videoId', '==', video_id)).limit(1).get()
         recipe = recipe_ref[0].to_dict() if recipe_ref else None
         
         if recipe:
             recipe['recipeId'] = recipe_ref[0].id
-            
-            # Get recipe items (instructions)
-            recipe_items_ref = db.collection('recipe_items').where('recipeId', '==', recipe['recipeId']).get()
+            embedded = split_embedded_recipe_data(recipe)
+            if embedded is not None:
+                return {"recipe": recipe, **embedded}
+        
+        # Recipes written before the embedded copy existed are assembled from
+        # the child collections
+        async def get_recipe_items():
+            if not recipe:
+                return []
+            recipe_items_ref = await RECIPE_ITEMS.where(filter=FieldFilter('recipeId', '==', recipe['recipeId'])).get()
             recipe_items = []
             for item in recipe_items_ref:
                 item_data = item.to_dict()
                 item_data['recipeItemId'] = item.id
                 recipe_items.append(item_data)
+            return recipe_items
+        
+        recipe_items, ingredients_ref, nutrition_ref = await asyncio.gather(
+            get_recipe_items(),
+            INGREDIENTS.where(filter=FieldFilter('videoId', '==', video_id)).get(),
+            NUTRITION.where(filter=FieldFilter('videoId', '==', video_id)).limit(1).get()
+        )
         
-        # Get ingredients
-        ingredients_ref = db.collection('ingredients').where('videoId', '==', video_id).get()
         ingredients = []
         for ingredient in ingredients_ref:
             ingredient_data = ingredient.to_dict()
             ingredient_data['ingredientId'] = ingredient.id
             ingredients.append(ingredient_data)
         
-        # Get nutrition info
-        nutrition_ref = db.collection('nutrition').where('videoId', '==', video_id).limit(1).get()
         nutrition = nutrition_ref[0].to_dict() if nutrition_ref else None
         if nutrition:
             nutrition['nutritionId'] = nutrition_ref[0].id
         
         return {
             "recipe": recipe,
-            "recipeItems": recipe_items if recipe else [],
+            "recipeItems": recipe_items,
             "ingredients": ingredients,
             "nutrition": nutrition
         }
     except Exception as e:
-        logger.error(f"Error getting recipe data: {str(e)}")
+        logger.exception("Error getting recipe data")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/videos/{video_id}")
-async def get_video(video_id: str, token_data=Depends(verify_token)):
+async def get_video(video_id: str, if_none_match: Optional[str] = Header(None), token_data=Depends(verify_token)):
     """Get single video details"""
-    try:
-        doc_ref = db.collection('videos').document(video_id)
-        doc = doc_ref.get()
-        if doc.exists:
+    # Cached as the encoded body and its ETag, so hits skip both the read and the encode
+    cached = _video_cache.get(video_id)
+    if cached is None:
+        try:
+            doc_ref = VIDEOS.document(video_id)
+            doc = await doc_ref.get()
+            if not doc.exists:
+                raise HTTPException(status_code=404, detail="Video not found")
             video_data = doc.to_dict()
             video_data['videoId'] = doc.id
-            return video_data
-        raise HTTPException(status_code=404, detail="Video not found")
-    except Exception as e:
-        logger.error(f"Error getting video: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+            body = dumps_json(video_data)
+            cached = (body, weak_etag(body))
+            _video_cache[video_id] = cached
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            logger.exception("Error getting video")
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    body, etag = cached
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    return Response(body, media_type='application/json', headers={'ETag': etag})
+
+# Placeholder content used by generate_recipe_data. Built once; each request
+# copies the entries into the documents it writes.
+RECIPE_INSTRUCTIONS_TEMPLATE = (
+    {"stepOrder": 1, "instruction": "Prepare all ingredients", "additionalDetails": "Ensure everything is at room temperature"},
+    {"stepOrder": 2, "instruction": "Mix dry ingredients", "additionalDetails": "Sift for best results"},
+    {"stepOrder": 3, "instruction": "Combine wet ingredients", "additionalDetails": "Mix until smooth"},
+    {"stepOrder": 4, "instruction": "Combine all ingredients", "additionalDetails": "Don't overmix"},
+    {"stepOrder": 5, "instruction": "Cook according to video instructions", "additionalDetails": "Follow temperature guidelines"}
+)
+
+RECIPE_INGREDIENTS_TEMPLATE = (
+    {"name": "All-purpose flour", "quantity": 2, "unit": "cups"},
+    {"name": "Sugar", "quantity": 1, "unit": "cup"},
+    {"name": "Eggs", "quantity": 2, "unit": "pieces"},
+    {"name": "Milk", "quantity": 1, "unit": "cup"},
+    {"name": "Butter", "quantity": 0.5, "unit": "cup"}
+)
+
+RECIPE_NUTRITION_TEMPLATE = {
+    "calories": 350,
+    "fat": 12,
+    "protein": 8,
+    "carbohydrates": 48,
+    "fiber": 2,
+    "sugar": 24,
+    "sodium": 400
+}
 
 @app.post("/api/videos/{video_id}/recipe/generate")
 async def generate_recipe_data(video_id: str, token_data=Depends(verify_token)):
     """Generate random recipe data for a video"""
     try:
         # Get video to ensure it exists
-        video_ref = db.collection('videos').document(video_id)
-        video = video_ref.get()
+        video_ref = VIDEOS.document(video_id)
+        video = await video_ref.get()
         if not video.exists:
             raise HTTPException(status_code=404, detail="Video not found")
 
         video_data = video.to_dict()
+        now = now_iso()
         
         # Generate random recipe
         recipe_data = {
@@ -791,77 +1461,65 @@ async def generate_recipe_data(video_id: str, token_data=Depends(verify_token)):
             "title": video_data.get('mealName', 'Delicious Recipe'),
             "summary": "A wonderful homemade recipe",
             "additionalNotes": "Best served fresh",
-            "createdAt": datetime.datetime.utcnow().isoformat(),
-            "updatedAt": datetime.datetime.utcnow().isoformat()
+            "createdAt": now,
+            "updatedAt": now
         }
         
-        # Create recipe
-        recipe_ref = db.collection('recipes').document()
-        recipe_ref.set(recipe_data)
+        # All documents are written in one batch at the end, so IDs are allocated up front
+        batch = db.batch()
+        recipe_ref = RECIPES.document()
         recipe_id = recipe_ref.id
 
         # Generate random recipe items (instructions)
-        instructions = [
-            {"stepOrder": 1, "instruction": "Prepare all ingredients", "additionalDetails": "Ensure everything is at room temperature"},
-            {"stepOrder": 2, "instruction": "Mix dry ingredients", "additionalDetails": "Sift for best results"},
-            {"stepOrder": 3, "instruction": "Combine wet ingredients", "additionalDetails": "Mix until smooth"},
-            {"stepOrder": 4, "instruction": "Combine all ingredients", "additionalDetails": "Don't overmix"},
-            {"stepOrder": 5, "instruction": "Cook according to video instructions", "additionalDetails": "Follow temperature guidelines"}
-        ]
-        
         recipe_items = []
-        for instruction in instructions:
-            item_ref = db.collection('recipe_items').document()
+        for instruction in RECIPE_INSTRUCTIONS_TEMPLATE:
+            item_ref = RECIPE_ITEMS.document()
             item_data = {
                 "recipeId": recipe_id,
                 **instruction
             }
-            item_ref.set(item_data)
+            batch.set(item_ref, item_data)
             recipe_items.append({**item_data, "recipeItemId": item_ref.id})
 
         # Generate random ingredients
-        ingredients = [
-            {"name": "All-purpose flour", "quantity": 2, "unit": "cups"},
-            {"name": "Sugar", "quantity": 1, "unit": "cup"},
-            {"name": "Eggs", "quantity": 2, "unit": "pieces"},
-            {"name": "Milk", "quantity": 1, "unit": "cup"},
-            {"name": "Butter", "quantity": 0.5, "unit": "cup"}
-        ]
-        
         ingredient_list = []
-        for ingredient in ingredients:
-            ing_ref = db.collection('ingredients').document()
+        for ingredient in RECIPE_INGREDIENTS_TEMPLATE:
+            ing_ref = INGREDIENTS.document()
             ing_data = {
                 "videoId": video_id,
                 **ingredient
             }
-            ing_ref.set(ing_data)
+            batch.set(ing_ref, ing_data)
             ingredient_list.append({**ing_data, "ingredientId": ing_ref.id})
 
         # Generate random nutrition data
         nutrition_data = {
             "videoId": video_id,
-            "calories": 350,
-            "fat": 12,
-            "protein": 8,
-            "carbohydrates": 48,
-            "fiber": 2,
-            "sugar": 24,
-            "sodium": 400
+            **RECIPE_NUTRITION_TEMPLATE
         }
         
-        nutrition_ref = db.collection('nutrition').document()
-        nutrition_ref.set(nutrition_data)
+        nutrition_ref = NUTRITION.document()
+        batch.set(nutrition_ref, nutrition_data)
         nutrition_data["nutritionId"] = nutrition_ref.id
 
+        # The recipe document also embeds its items, ingredients and nutrition
+        # so get_recipe_data can serve it with a single read
+        batch.set(recipe_ref, {
+            **recipe_data,
+            **embedded_recipe_data(recipe_items, ingredient_list, nutrition_data)
+        })
+        await batch.commit()
+
         return {
             "recipe": {**recipe_data, "recipeId": recipe_id},
             "recipeItems": recipe_items,
             "ingredients": ingredient_list,
             "nutrition": nutrition_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating recipe data: {str(e)}")
+        logger.exception("Error generating recipe data")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/meals/rate")
@@ -877,90 +1535,115 @@ async def rate_meal(
         meal_id = rating_data.get('mealId')
         comment = rating_data.get('comment')
         
-        rating_ref = db.collection('meal_ratings').document()
+        rating_ref = MEAL_RATINGS.document()
         rating_data = {
             "userId": user_id,
             "videoId": video_id,
             "mealId": meal_id,
             "rating": rating,
             "comment": comment,
-            "ratedAt": datetime.datetime.utcnow().isoformat()
+            "ratedAt": now_iso()
         }
         
-        rating_ref.set(rating_data)
+        aggregate_ref = RATING_AGGREGATES.document(user_video_doc_id(user_id, video_id))
+        
+        @firestore.async_transactional
+        async def save_rating(transaction):
+            aggregate = await aggregate_ref.get(transaction=transaction)
+            if aggregate.exists:
+                aggregate = aggregate.to_dict()
+            else:
+                # First rating since aggregates were introduced, or not yet
+                # backfilled: start from the video's earlier ratings
+                aggregate = await build_rating_aggregate(user_id, video_id, transaction)
+            transaction.set(rating_ref, rating_data)
+            transaction.set(aggregate_ref, add_rating_to_aggregate(aggregate, rating_data))
+        
+        await save_rating(db.transaction())
+        invalidate_user_cache(_aggregated_ratings_cache, user_id)
         rating_data['ratingId'] = rating_ref.id
         
         return rating_data
     except Exception as e:
-        logger.error(f"Error rating meal: {str(e)}")
+        logger.exception("Error rating meal")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/meals/ratings")
-async def get_user_ratings(token_data=Depends(verify_token)):
-    """Get user's meal ratings"""
+async def get_user_ratings(
+    page_size: Optional[int] = None,
+    last_rating_id: Optional[str] = None,
+    token_data=Depends(verify_token)
+):
+    """Get user's meal ratings, most recent first; paginated when page_size is given"""
     try:
         user_id = token_data['uid']
-        ratings = db.collection('meal_ratings').where('userId', '==', user_id).get()
+        # Served by the (userId, ratedAt) composite index
+        query = (MEAL_RATINGS
+            .where(filter=FieldFilter('userId', '==', user_id))
+            .order_by('ratedAt', direction=firestore.Query.DESCENDING)
+            .order_by(FieldPath.document_id(), direction=firestore.Query.DESCENDING))
+        
+        if last_rating_id:
+            last_doc = await MEAL_RATINGS.document(last_rating_id).get()
+            if last_doc.exists:
+                query = query.start_after(last_doc)
+        if page_size:
+            query = query.limit(page_size)
+        
+        ratings = await query.get()
         
         return [
             {**rating.to_dict(), 'ratingId': rating.id}
             for rating in ratings
         ]
     except Exception as e:
-        logger.error(f"Error getting ratings: {str(e)}")
+        logger.exception("Error getting ratings")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/meals/ratings/aggregated")
 @log_operation("get_aggregated_ratings")
-async def get_aggregated_ratings(token_data=Depends(verify_token)):
+async def get_aggregated_ratings(if_none_match: Optional[str] = Header(None), token_data=Depends(verify_token)):
     """Get aggregated ratings for each video with video details"""
     request_id = f"get-agg-ratings-{int(time.time())}"
     logger.info(f"[{request_id}] Getting aggregated ratings for user {token_data['uid']}")
     
+    cached = _aggregated_ratings_cache.get(token_data['uid'])
+    if cached is not None:
+        body, etag = cached
+        if etag_matches(if_none_match, etag):
+            logger.info(f"[{request_id}] Aggregated ratings not modified")
+            return Response(status_code=304, headers={'ETag': etag})
+        logger.info(f"[{request_id}] Returning cached aggregated ratings")
+        return Response(body, media_type='application/json', headers={'ETag': etag})
+    
     try:
         user_id = token_data['uid']
-        ratings_ref = db.collection('meal_ratings').where('userId', '==', user_id)
-        ratings = ratings_ref.get()
-        
-        # Group ratings by videoId
-        video_ratings = {}
-        for rating in ratings:
-            rating_data = rating.to_dict()
-            video_id = rating_data['videoId']
-            
-            if video_id not in video_ratings:
-                video_ratings[video_id] = {
-                    'ratings': [],
-                    'comments': [],
-                    'lastRated': rating_data['ratedAt']
-                }
-            
-            video_ratings[video_id]['ratings'].append(rating_data['rating'])
-            if rating_data.get('comment'):
-                video_ratings[video_id]['comments'].append(rating_data['comment'])
-            
-            # Update lastRated if this rating is more recent
-            if rating_data['ratedAt'] > video_ratings[video_id]['lastRated']:
-                video_ratings[video_id]['lastRated'] = rating_data['ratedAt']
-        
-        # Calculate averages and get video details
+        generation = user_cache_generation(user_id)
+        # Most recently rated first, served by the (userId, lastRated) composite index
+        aggregates = await (RATING_AGGREGATES
+            .where(filter=FieldFilter('userId', '==', user_id))
+            .order_by('lastRated', direction=firestore.Query.DESCENDING)
+            .get())
+        video_ratings = {aggregate.get('videoId'): aggregate.to_dict() for aggregate in aggregates}
+        
+        # Get video details for every rated video in one batched read
+        videos = await get_videos_by_ids(list(video_ratings), request_id)
+        
+        # Calculate averages
         result = []
         for video_id, data in video_ratings.items():
-            # Get video details
-            video_doc = db.collection('videos').document(video_id).get()
-            if not video_doc.exists:
+            video_data = videos.get(video_id)
+            if video_data is None:
                 logger.warning(f"[{request_id}] Video {video_id} not found")
                 continue
-                
-            video_data = video_doc.to_dict()
             
             # Calculate average rating
-            avg_rating = sum(data['ratings']) / len(data['ratings'])
+            avg_rating = data['ratingSum'] / data['ratingCount']
             
             result.append({
                 'videoId': video_id,
                 'averageRating': round(avg_rating, 1),
-                'numberOfRatings': len(data['ratings']),
+                'numberOfRatings': data['ratingCount'],
                 'lastRated': data['lastRated'],
                 'comments': data['comments'],
                 'video': {
@@ -970,13 +1653,17 @@ async def get_aggregated_ratings(token_data=Depends(verify_token)):
                 }
             })
         
-        # Sort by lastRated date (most recent first)
-        result.sort(key=lambda x: x['lastRated'], reverse=True)
-        
+        # Cache the encoded body so hits skip the reads and the encode
+        body = dumps_json(result)
+        etag = weak_etag(body)
+        if user_cache_generation(user_id) == generation:
+            _aggregated_ratings_cache[user_id] = (body, etag)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag})
         logger.info(f"[{request_id}] Returning {len(result)} aggregated ratings")
-        return result
+        return Response(body, media_type='application/json', headers={'ETag': etag})
     except Exception as e:
-        logger.error(f"[{request_id}] Error getting aggregated ratings: {str(e)}")
+        logger.exception("[%s] Error getting aggregated ratings", request_id)
         raise HTTPException(status_code=500, detail=f"Failed to get aggregated ratings: {str(e)}")
 
 # Add more endpoints as needed based on your PRD requirements
@@ -987,8 +1674,16 @@ if __name__ == "__main__":
     # Get port from environment variable or default to 8001
     port = int(os.environ.get("PORT", 8001))
     
+    # Auto-reload is for local development only: it runs the server under a
+    # file watcher and can't be combined with multiple workers
+    reload = os.environ.get("DEV") == "1"
+    workers = 1 if reload else int(os.environ.get("WEB_CONCURRENCY", 1))
+    
     # Bind to 0.0.0.0 instead of localhost for production
     uvicorn.run("app:app", 
                 host="0.0.0.0",
                 port=port,
-                reload=True)
+                reload=reload,
+                workers=workers,
+                loop="uvloop",
+                http="httptools")
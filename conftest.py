@@ -0,0 +1,19 @@
+# pytest puts the directory of a rootdir conftest.py on sys.path, so plain
+# `pytest` can import app modules such as firebase_tokens the same way
+# `python -m pytest` does.
+import os
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# app initializes Firebase on import; a throwaway service account key lets
+# that succeed offline. Building clients and queries makes no network calls.
+if not os.environ.get("FIREBASE_PRIVATE_KEY"):
+    _key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    os.environ["FIREBASE_PRIVATE_KEY"] = _key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    os.environ["FIREBASE_PROJECT_ID"] = "home-yum-test"
+    os.environ["FIREBASE_PRIVATE_KEY_ID"] = "test-key"
+    os.environ["FIREBASE_CLIENT_EMAIL"] = "test@home-yum-test.iam.gserviceaccount.com"
+    os.environ["FIREBASE_CLIENT_ID"] = "0"
@@ -0,0 +1,44 @@
+"""
+Local verification of Firebase ID tokens against Google's securetoken signing
+certs, following the checks firebase_admin.auth.verify_id_token makes.
+
+Kept apart from app.py, which initializes Firebase on import, so the checks
+can be tested on their own.
+"""
+import time
+
+from google.auth import jwt
+
+# Seconds of clock drift between this server and Google's tolerated on iat,
+# exp and auth_time
+CLOCK_SKEW_SECONDS = 5
+
+def token_issuer(project_id: str) -> str:
+    return f"https://securetoken.google.com/{project_id}"
+
+def verify_firebase_token(token: str, certs: dict, project_id: str) -> dict:
+    """Verify a Firebase ID token against key ID -> PEM certs and return its claims, with `uid` set.
+
+    Raises ValueError if the token is malformed, badly signed, expired, issued
+    in the future, or meant for another project.
+    """
+    header = jwt.decode_header(token)
+    if header.get('alg') != 'RS256':
+        raise ValueError(f"Unexpected token algorithm: {header.get('alg')}")
+    if header.get('kid') not in certs:
+        raise ValueError(f"Unknown token key ID: {header.get('kid')}")
+
+    # Checks the signature, aud, and that iat is not in the future and exp has not passed
+    claims = jwt.decode(token, certs=certs, audience=project_id, clock_skew_in_seconds=CLOCK_SKEW_SECONDS)
+    if claims.get('iss') != token_issuer(project_id):
+        raise ValueError(f"Unexpected token issuer: {claims.get('iss')}")
+
+    auth_time = claims.get('auth_time')
+    if not isinstance(auth_time, (int, float)) or auth_time > time.time() + CLOCK_SKEW_SECONDS:
+        raise ValueError("Invalid token auth_time")
+
+    subject = claims.get('sub')
+    if not isinstance(subject, str) or not subject or len(subject) > 128:
+        raise ValueError("Invalid token subject")
+    claims['uid'] = subject
+    return claims
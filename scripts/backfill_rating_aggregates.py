@@ -0,0 +1,57 @@
+"""
+One-off backfill of video_rating_aggregates/{userId}_{videoId} from the
+existing meal_ratings documents. Aggregates are rebuilt from scratch, so it is
+safe to re-run.
+
+Each aggregate is rebuilt in a transaction that reads the aggregate document
+alongside the ratings, the same document rate_meal reads, so a rating saved
+while the script runs is either included in the rebuild or applied on top of
+it, never overwritten.
+
+Deploy ordering: get_aggregated_ratings reads only the aggregates, so this
+must have run before the aggregate code serves traffic. render.yaml runs it as
+the preDeployCommand of every release. The first release that introduces
+aggregates replaces instances that don't maintain them, so run it once more
+after that deploy finishes to pick up ratings saved in between; rate_meal
+itself builds any aggregate that is still missing from the video's earlier
+ratings.
+
+Run from the repository root with the same environment as the API:
+    python -m scripts.backfill_rating_aggregates
+"""
+import asyncio
+
+from firebase_admin import firestore
+
+from app import MEAL_RATINGS, RATING_AGGREGATES, build_rating_aggregate, db, logger, user_video_doc_id
+
+# Transactions run at once; each reads and writes a single aggregate
+CONCURRENT_TRANSACTIONS = 20
+
+async def rebuild_aggregate(user_id: str, video_id: str) -> None:
+    aggregate_ref = RATING_AGGREGATES.document(user_video_doc_id(user_id, video_id))
+
+    @firestore.async_transactional
+    async def rebuild(transaction):
+        await aggregate_ref.get(transaction=transaction)
+        aggregate = await build_rating_aggregate(user_id, video_id, transaction)
+        if aggregate is None:
+            transaction.delete(aggregate_ref)
+        else:
+            transaction.set(aggregate_ref, aggregate)
+
+    await rebuild(db.transaction())
+
+async def backfill():
+    pairs = set()
+    async for rating in MEAL_RATINGS.select(['userId', 'videoId']).stream():
+        pairs.add((rating.get('userId'), rating.get('videoId')))
+
+    pairs = list(pairs)
+    for start in range(0, len(pairs), CONCURRENT_TRANSACTIONS):
+        await asyncio.gather(*[rebuild_aggregate(user_id, video_id)
+                               for user_id, video_id in pairs[start:start + CONCURRENT_TRANSACTIONS]])
+    logger.info(f"Backfilled {len(pairs)} rating aggregates")
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
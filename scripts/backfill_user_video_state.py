@@ -0,0 +1,35 @@
+"""
+One-off backfill of user_video_state/{userId}/videos/{videoId} from the
+existing user_video_reactions and user_try_list rows.
+
+Run from the repository root with the same environment as the API:
+    python -m scripts.backfill_user_video_state
+"""
+import asyncio
+
+from app import REACTIONS, TRY_LIST, commit_batched_sets, logger, reaction_state, try_list_state, user_video_state_ref
+
+async def backfill():
+    writes = []
+    
+    async for reaction in REACTIONS.stream():
+        reaction_data = reaction.to_dict()
+        writes.append((
+            user_video_state_ref(reaction_data['userId'], reaction_data['videoId']),
+            reaction_state(reaction.id, reaction_data)
+        ))
+    reaction_count = len(writes)
+    
+    async for try_list_item in TRY_LIST.stream():
+        try_list_data = try_list_item.to_dict()
+        writes.append((
+            user_video_state_ref(try_list_data['userId'], try_list_data['videoId']),
+            try_list_state(try_list_item.id, try_list_data)
+        ))
+    
+    # merge=True so the reaction and try list halves of a state document don't overwrite each other
+    await commit_batched_sets(writes, merge=True)
+    logger.info(f"Backfilled user video state from {reaction_count} reactions and {len(writes) - reaction_count} try list items")
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,39 @@
+"""
+One-off migration that copies each recipe's items, ingredients and nutrition
+into the recipe document, so get_recipe_data can serve it with a single read.
+
+Run from the repository root with the same environment as the API:
+    python -m scripts.embed_recipe_data
+"""
+import asyncio
+
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from app import (INGREDIENTS, NUTRITION, RECIPE_ITEMS, RECIPES, commit_batched_sets, embedded_recipe_data,
+                 logger)
+
+async def load_embedded_data(recipe) -> dict:
+    """Read a recipe's child collections in the shape get_recipe_data returns"""
+    video_id = recipe.get('videoId')
+    items, ingredients, nutrition = await asyncio.gather(
+        RECIPE_ITEMS.where(filter=FieldFilter('recipeId', '==', recipe.id)).get(),
+        INGREDIENTS.where(filter=FieldFilter('videoId', '==', video_id)).get(),
+        NUTRITION.where(filter=FieldFilter('videoId', '==', video_id)).limit(1).get()
+    )
+    nutrition_data = None
+    if nutrition:
+        nutrition_data = {**nutrition[0].to_dict(), 'nutritionId': nutrition[0].id}
+    return embedded_recipe_data(
+        [{**item.to_dict(), 'recipeItemId': item.id} for item in items],
+        [{**ingredient.to_dict(), 'ingredientId': ingredient.id} for ingredient in ingredients],
+        nutrition_data
+    )
+
+async def migrate():
+    recipes = [recipe async for recipe in RECIPES.stream() if 'recipeItems' not in recipe.to_dict()]
+    embedded = await asyncio.gather(*[load_embedded_data(recipe) for recipe in recipes])
+    await commit_batched_sets([(recipe.reference, data) for recipe, data in zip(recipes, embedded)], merge=True)
+    logger.info(f"Embedded child data into {len(recipes)} recipes")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,56 @@
+"""
+One-off migration of user_video_reactions and user_try_list rows written
+with random document IDs to the deterministic {userId}_{videoId} IDs that
+add_reaction, add_to_try_list and the remove endpoints address directly.
+
+For each (userId, videoId) the row already at the deterministic ID wins;
+otherwise the most recent legacy row is copied there. Every other row for
+the pair is deleted and the user_video_state document is repointed at the
+kept row. The copies are committed before any deletes, so the script is
+safe to re-run.
+
+Deploy ordering: run this before deploying the deterministic-ID code (the
+previous code looks rows up by query, so it keeps working on re-keyed rows),
+then once more after the deploy has finished to pick up rows written by
+instances that were still running the old code. Run
+backfill_user_video_state afterwards if it has not been run yet.
+
+Run from the repository root with the same environment as the API:
+    python -m scripts.rekey_user_video_rows
+"""
+import asyncio
+
+from app import (REACTIONS, TRY_LIST, commit_batched_deletes, commit_batched_sets, logger, reaction_state,
+                 try_list_state, user_video_doc_id, user_video_state_ref)
+
+async def rekey(collection_ref, date_field: str, state_builder) -> None:
+    rows = {}
+    async for row in collection_ref.stream():
+        row_data = row.to_dict()
+        rows.setdefault((row_data['userId'], row_data['videoId']), []).append((row.id, row.reference, row_data))
+
+    writes = []
+    stale_refs = []
+    for (user_id, video_id), pair_rows in rows.items():
+        doc_id = user_video_doc_id(user_id, video_id)
+        if len(pair_rows) == 1 and pair_rows[0][0] == doc_id:
+            continue
+
+        kept = next((row for row in pair_rows if row[0] == doc_id), None)
+        if kept is None:
+            kept = max(pair_rows, key=lambda row: row[2].get(date_field) or '')
+            writes.append((collection_ref.document(doc_id), kept[2]))
+        writes.append((user_video_state_ref(user_id, video_id), state_builder(doc_id, kept[2])))
+        stale_refs.extend(ref for row_id, ref, _ in pair_rows if row_id != doc_id)
+
+    # merge=True so the state write leaves the other half of the state document alone
+    await commit_batched_sets(writes, merge=True)
+    await commit_batched_deletes(stale_refs)
+    logger.info(f"Re-keyed {collection_ref.id}: removed {len(stale_refs)} legacy rows across {len(rows)} user/video pairs")
+
+async def main():
+    await rekey(REACTIONS, 'reactionDate', reaction_state)
+    await rekey(TRY_LIST, 'addedDate', try_list_state)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import datetime
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from firebase_tokens import CLOCK_SKEW_SECONDS, token_issuer, verify_firebase_token
+
+PROJECT_ID = "home-yum-test"
+KEY_ID = "test-key"
+
+def make_key_and_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken.test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256()))
+    key_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+    return key_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+KEY_PEM, CERT_PEM = make_key_and_cert()
+CERTS = {KEY_ID: CERT_PEM}
+
+def make_token(key_pem=KEY_PEM, key_id=KEY_ID, **overrides):
+    now = int(time.time())
+    claims = {
+        'iss': token_issuer(PROJECT_ID),
+        'aud': PROJECT_ID,
+        'sub': "user-123",
+        'iat': now,
+        'exp': now + 3600,
+        'auth_time': now,
+    }
+    claims.update(overrides)
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(crypt.RSASigner.from_string(key_pem, key_id=key_id), claims).decode()
+
+def test_valid_token_returns_claims_with_uid():
+    claims = verify_firebase_token(make_token(), CERTS, PROJECT_ID)
+    assert claims['uid'] == "user-123"
+    assert claims['aud'] == PROJECT_ID
+
+def test_wrong_audience_is_rejected():
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(aud="another-project"), CERTS, PROJECT_ID)
+
+def test_wrong_issuer_is_rejected():
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(iss=token_issuer("another-project")), CERTS, PROJECT_ID)
+
+def test_expired_token_is_rejected():
+    now = int(time.time())
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(iat=now - 7200, exp=now - 3600, auth_time=now - 7200), CERTS, PROJECT_ID)
+
+def test_future_iat_is_rejected():
+    now = int(time.time())
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(iat=now + CLOCK_SKEW_SECONDS + 60), CERTS, PROJECT_ID)
+
+def test_future_auth_time_is_rejected():
+    now = int(time.time())
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(auth_time=now + CLOCK_SKEW_SECONDS + 60), CERTS, PROJECT_ID)
+
+def test_missing_auth_time_is_rejected():
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(auth_time=None), CERTS, PROJECT_ID)
+
+def test_empty_subject_is_rejected():
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(sub=""), CERTS, PROJECT_ID)
+
+def test_unknown_key_id_is_rejected():
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(key_id="rotated-out"), CERTS, PROJECT_ID)
+
+def test_signature_from_another_key_is_rejected():
+    other_key_pem, _ = make_key_and_cert()
+    with pytest.raises(ValueError):
+        verify_firebase_token(make_token(key_pem=other_key_pem), CERTS, PROJECT_ID)
@@ -0,0 +1,17 @@
+import datetime
+
+from app import video_feed_query
+
+def test_feed_query_orders_newest_first_with_document_id_tie_breaker():
+    query_pb = video_feed_query(10)._to_protobuf()
+    assert [order.field.field_path for order in query_pb.order_by] == ['uploadedAt', '__name__']
+    assert query_pb.limit == 10
+
+def test_feed_query_starts_after_echoed_cursor_values():
+    uploaded_at = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+    query_pb = video_feed_query(10, {'uploadedAt': uploaded_at, '__name__': 'video-1'})._to_protobuf()
+
+    assert not query_pb.start_at.before
+    uploaded_at_value, name_value = query_pb.start_at.values
+    assert uploaded_at_value.timestamp_value == uploaded_at
+    assert name_value.reference_value.endswith('/documents/videos/video-1')